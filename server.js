@@ -242,7 +242,7 @@ function generateMapUrl(places) {
 app.post("/search-places", async (c) => {
   try {
     const body = await c.req.json()
-    const { query, location, radius = 2000, type } = body
+    const { query, location, radius = 2000, type, limit = 10 } = body
 
     if (!query) {
       return c.json({ error: "Query parameter is required" }, 400)
@@ -266,8 +266,9 @@ app.post("/search-places", async (c) => {
       )
     }
 
-    // Process places data
-    const processedPlaces = places.slice(0, 10).map((place) => ({
+    // Process places data (at most 10, or fewer if the client asks)
+    const maxPlaces = Math.min(Math.max(parseInt(limit, 10) || 10, 1), 10)
+    const processedPlaces = places.slice(0, maxPlaces).map((place) => ({
       name: place.name || "",
       address: place.vicinity || place.formatted_address || "",
       rating: place.rating || null,
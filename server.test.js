@@ -88,6 +88,12 @@ async function testPlacesSearch() {
     {
       query: 'pizza',
       description: 'Pizza places (no location)'
+    },
+    {
+      query: 'gas station',
+      location: 'Austin, TX',
+      limit: 3,
+      description: 'Gas stations in Austin (limit 3)'
     }
   ]
 
@@ -99,7 +105,12 @@ async function testPlacesSearch() {
 
     const result = await testEndpoint('/search-places', 'POST', testCase)
 
-    if (result.ok && result.status === 200) {
+    const overLimit =
+      testCase.limit &&
+      ((result.data?.places?.length || 0) > testCase.limit ||
+        (result.data?.place_embeds?.length || 0) > testCase.limit)
+
+    if (result.ok && result.status === 200 && !overLimit) {
       const data = result.data
       console.log(`    ✅ Found ${data.places?.length || 0} places`)
 
@@ -112,6 +123,10 @@ async function testPlacesSearch() {
 
       console.log(`    🔗 Map URL: ${data.map_url?.substring(0, 60)}...`)
       passed++
+    } else if (overLimit) {
+      console.log(
+        `    ❌ Limit ${testCase.limit} not applied: ${result.data.places?.length} places, ${result.data.place_embeds?.length} embeds`
+      )
     } else {
       console.log(`    ❌ Failed: ${result.status} - ${result.data?.message || result.error}`)
     }
@@ -4,12 +4,75 @@ author: Yusoof Moh
 author_url: https://github.com/yusoofsh
 version: 1.0.0
 license: MIT
-requirements: requests
+requirements: requests, aiohttp, cachetools, orjson
 """
 
+import asyncio
+import aiohttp
+import copy
+import inspect
+import orjson
 import requests
 import os
-from typing import Dict, Any, Optional
+import random
+import threading
+from functools import lru_cache
+from itertools import islice
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional
+
+_VALID_MODES = frozenset({"driving", "walking", "transit", "bicycling"})
+_DEFAULT_MODE = "driving"
+
+# Places rendered per response; also sent as the backend's result limit
+_MAX_PLACES = 5
+
+_ADDRESS_PREFIX = "   📍 "
+_DIRECTIONS_PREFIX = "   🧭 "
+_PLACE_TMPL = "{i}. **{name}**{rating}\n" + _ADDRESS_PREFIX + "{addr}{embed}{dir}\n"
+
+# Retry budget for throttled/transient backend responses
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_TOTAL = 3
+_BACKOFF_MAX = 30
+# backoff_jitter/backoff_max only exist on urllib3 2.x
+_RETRY_HAS_JITTER = "backoff_jitter" in inspect.signature(Retry.__init__).parameters
+
+# Bodies are pre-serialized with orjson, so the type is sent explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_DIRECTIONS_TEMPLATE = '''<div>
+        <h2>🧭 {mode} Directions</h2>
+        <p><strong>📍 From:</strong> {start_address}</p>
+        <p><strong>📍 To:</strong> {end_address}</p>
+        <p><strong>⏱️ Duration:</strong> {duration}</p>
+        <p><strong>📏 Distance:</strong> {distance}</p>
+        <p><a href="{directions_url}" target="_blank">🗺️ <strong>View Turn-by-Turn Directions</strong></a></p>
+        <p><em>💡 Tip: Click the link above for detailed navigation!</em></p>
+        </div>'''
+
+class _CappedRetry(Retry):
+    """Retry that never sleeps longer than _BACKOFF_MAX on a Retry-After"""
+
+    # urllib3 1.26 has no backoff_max argument and caps backoff with this
+    DEFAULT_BACKOFF_MAX = _BACKOFF_MAX
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _BACKOFF_MAX)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, capped at _BACKOFF_MAX"""
+    try:
+        return min(max(float(value), 0.0), _BACKOFF_MAX)
+    except (TypeError, ValueError):
+        return None
+
 
 class Tools:
     def __init__(self):
@@ -18,9 +81,229 @@ class Tools:
             "API_SECRET",
             "ed5e429045dda242702c62bb7618f33125eed7f4ee6b4ac02a70762364be198c",
         )
-        self.headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "application/json",
+        # Content-Type is sent per request alongside the orjson body
+        self.headers = {"Authorization": f"Bearer {self.api_token}"}
+
+        # Shared session so keep-alive connections to the backend are reused;
+        # the token is pre-encoded once instead of on every send
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {self.api_token}".encode("latin-1")
+        # Retry throttled/transient statuses with exponential backoff + jitter;
+        # connection and read errors are not retried so a hung backend still
+        # costs a single timeout
+        retry_kwargs = {}
+        if _RETRY_HAS_JITTER:
+            retry_kwargs.update(backoff_jitter=0.5, backoff_max=_BACKOFF_MAX)
+        retry = _CappedRetry(
+            total=_RETRY_TOTAL,
+            connect=0,
+            read=0,
+            other=0,
+            backoff_factor=1.0,
+            status_forcelist=sorted(_RETRY_STATUSES),
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            **retry_kwargs,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Memoize successful lookups; the module-level instance is shared
+        self._search_cache = TTLCache(maxsize=512, ttl=900)
+        self._dir_cache = TTLCache(maxsize=512, ttl=3600)
+        self._cache_lock = threading.Lock()
+
+        # Created on first use from inside a running event loop; the session is
+        # bound to that loop, so it is rebuilt when called from a different one
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._aio_guard = None
+
+    @staticmethod
+    async def _session_guard(session: aiohttp.ClientSession):
+        """Close the session when its loop shuts down async generators.
+
+        asyncio.run() finalizes pending async generators before closing the
+        loop, which is the last point the session's sockets can be closed.
+        """
+        try:
+            yield
+        finally:
+            await session.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared aiohttp session for the async variants"""
+        loop = asyncio.get_running_loop()
+        stale = self._aio_session
+        if stale is not None and not stale.closed and self._aio_loop is not loop:
+            # Its loop ended without finalizing the guard; drop the pooled
+            # connections so they aren't reused or reported as leaked
+            stale.connector._close()
+            stale.detach()
+        if (
+            self._aio_session is None
+            or self._aio_session.closed
+            or self._aio_loop is not loop
+        ):
+            self._aio_session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+            self._aio_loop = loop
+            self._aio_guard = self._session_guard(self._aio_session)
+            await self._aio_guard.__anext__()
+        return self._aio_session
+
+    async def aclose(self) -> None:
+        """Close the shared aiohttp session, if one is open.
+
+        Loops that don't shut down async generators on exit (asyncio.run does)
+        should await this before they end.
+        """
+        if self._aio_guard is not None and self._aio_loop is asyncio.get_running_loop():
+            await self._aio_guard.aclose()
+        elif self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+        self._aio_loop = None
+        self._aio_guard = None
+
+    async def _apost(self, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """POST to the backend, retrying 429/5xx on the sync session's schedule.
+
+        Mirrors urllib3's Retry: no sleep before the first retry, then
+        exponential backoff plus jitter, with Retry-After honoured only for
+        the statuses urllib3 honours it for. Returns the decoded body on 200,
+        None on any other final status.
+        """
+        session = await self._get_session()
+        body = orjson.dumps(payload)
+        for attempt in range(_RETRY_TOTAL + 1):
+            async with session.post(
+                f"{self.api_url}{path}", data=body, headers=_JSON_HEADERS
+            ) as response:
+                if response.status == 200:
+                    return orjson.loads(await response.read())
+                if response.status not in _RETRY_STATUSES or attempt == _RETRY_TOTAL:
+                    return None
+                delay = None
+                if response.status in Retry.RETRY_AFTER_STATUS_CODES:
+                    delay = _parse_retry_after(response.headers.get("Retry-After"))
+            if not delay and attempt > 0:
+                delay = min(2 ** attempt + random.uniform(0, 0.5), _BACKOFF_MAX)
+            if delay:
+                await asyncio.sleep(delay)
+        return None
+
+    # The caches hold raw backend responses rather than shaped results, so the
+    # echoed query/location/origin/destination always come from the caller.
+    # Entries are copied in and out so callers mutating a result can't
+    # change what later cache hits return.
+    def _cache_get(self, cache: TTLCache, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            data = cache.get(key)
+        return copy.deepcopy(data)
+
+    def _cache_put(self, cache: TTLCache, key: tuple, data: Optional[Dict[str, Any]]) -> None:
+        # Never cache failures so a transient error doesn't stick
+        if data is not None:
+            data = copy.deepcopy(data)
+            with self._cache_lock:
+                cache[key] = data
+
+    @staticmethod
+    def _search_key(
+        query: str,
+        location: Optional[str],
+        place_type: Optional[str],
+        radius: int,
+        limit: Optional[int],
+    ) -> tuple:
+        return (
+            query.strip().lower(),
+            (location or "").strip().lower(),
+            (place_type or "").strip().lower(),
+            radius,
+            limit,
+        )
+
+    @staticmethod
+    def _directions_key(origin: str, destination: str, mode: str) -> tuple:
+        return (origin.strip().lower(), destination.strip().lower(), mode)
+
+    def _search_payload(
+        self,
+        query: str,
+        location: Optional[str],
+        place_type: Optional[str],
+        radius: int,
+        limit: Optional[int],
+    ) -> Dict[str, Any]:
+        payload = {"query": query, "radius": radius}
+        if location is not None:
+            payload["location"] = location
+        if place_type is not None:
+            payload["type"] = place_type
+        if limit is not None:
+            payload["limit"] = limit
+        return payload
+
+    def _search_result(
+        self, query: str, location: Optional[str], data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Shape a backend /search-places response (None on non-200)"""
+        if data is None:
+            return {
+                "success": False,
+                "query": query,
+                "location": location,
+                "message": f"No places found for '{query}'" + (f" in {location}" if location else ""),
+            }
+        places = data.get("places", [])
+        # The backend may be asked to return fewer places than it found
+        total_found = data.get("total_results", len(places))
+        return {
+            "success": True,
+            "query": query,
+            "location": location,
+            "total_found": total_found,
+            "places": places,
+            "place_embeds": data.get("place_embeds", []),
+            "map_url": data.get("map_url", ""),
+            "directions_url": data.get("directions_url", ""),
+            "embed_html": data.get("embed_html", ""),
+            "center_coordinates": f"{data.get('center_lat', 0):.4f}, {data.get('center_lng', 0):.4f}",
+            "message": f"Found {total_found} places for '{query}'" + (f" in {location}" if location else ""),
+        }
+
+    def _directions_result(
+        self, origin: str, destination: str, mode: str, data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Shape a backend /directions response (None on non-200)"""
+        if data is None:
+            return {
+                "success": False,
+                "origin": origin,
+                "destination": destination,
+                "mode": mode,
+                "message": f"No {mode} route found between these locations.",
+            }
+        duration = data.get("duration", "Unknown")
+        distance = data.get("distance", "Unknown")
+        return {
+            "success": True,
+            "origin": origin,
+            "destination": destination,
+            "mode": mode.title(),
+            "duration": duration,
+            "distance": distance,
+            "start_address": data.get("start_address", origin),
+            "end_address": data.get("end_address", destination),
+            "directions_url": data.get("url", ""),
+            "message": f"{mode.title()} directions: {duration} ({distance})",
         }
 
     def search_places(
@@ -29,47 +312,53 @@ class Tools:
         location: Optional[str] = None,
         place_type: Optional[str] = None,
         radius: int = 2000,
+        limit: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Backend API call - keep your existing logic"""
+        """Backend API call - keep your existing logic
+
+        total_found and message report the backend's total_results, which can
+        exceed len(places) when a limit is passed.
+        """
         try:
-            payload = {
-                "query": query,
-                "location": location,
-                "type": place_type,
-                "radius": radius,
-            }
-            payload = {k: v for k, v in payload.items() if v is not None}
+            key = self._search_key(query, location, place_type, radius, limit)
+            data = self._cache_get(self._search_cache, key)
+            if data is None:
+                payload = self._search_payload(query, location, place_type, radius, limit)
 
-            response = requests.post(
-                f"{self.api_url}/search-places",
-                headers=self.headers,
-                json=payload,
-                timeout=30,
-            )
+                response = self.session.post(
+                    f"{self.api_url}/search-places",
+                    data=orjson.dumps(payload),
+                    headers=_JSON_HEADERS,
+                    timeout=30,
+                )
 
-            if response.status_code == 200:
-                data = response.json()
-                places = data.get("places", [])
-                return {
-                    "success": True,
-                    "query": query,
-                    "location": location,
-                    "total_found": len(places),
-                    "places": places,
-                    "place_embeds": data.get("place_embeds", []),
-                    "map_url": data.get("map_url", ""),
-                    "directions_url": data.get("directions_url", ""),
-                    "embed_html": data.get("embed_html", ""),
-                    "center_coordinates": f"{data.get('center_lat', 0):.4f}, {data.get('center_lng', 0):.4f}",
-                    "message": f"Found {len(places)} places for '{query}'" + (f" in {location}" if location else ""),
-                }
-            else:
-                return {
-                    "success": False,
-                    "query": query,
-                    "location": location,
-                    "message": f"No places found for '{query}'" + (f" in {location}" if location else ""),
-                }
+                data = orjson.loads(response.content) if response.status_code == 200 else None
+                self._cache_put(self._search_cache, key, data)
+            return self._search_result(query, location, data)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Unexpected error: {str(e)}",
+                "message": "An unexpected error occurred while searching for places.",
+            }
+
+    async def asearch_places(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        place_type: Optional[str] = None,
+        radius: int = 2000,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of search_places for concurrent tool calls"""
+        try:
+            key = self._search_key(query, location, place_type, radius, limit)
+            data = self._cache_get(self._search_cache, key)
+            if data is None:
+                payload = self._search_payload(query, location, place_type, radius, limit)
+                data = await self._apost("/search-places", payload)
+                self._cache_put(self._search_cache, key, data)
+            return self._search_result(query, location, data)
         except Exception as e:
             return {
                 "success": False,
@@ -77,44 +366,53 @@ class Tools:
                 "message": "An unexpected error occurred while searching for places.",
             }
 
+    async def search_many(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Run several place searches concurrently"""
+        return await asyncio.gather(*[self.asearch_places(q) for q in queries])
+
     def get_directions(
         self, origin: str, destination: str, mode: str = "driving"
     ) -> Dict[str, Any]:
         """Get directions from backend API"""
         try:
-            payload = {"origin": origin, "destination": destination, "mode": mode.lower()}
+            m = mode.lower()
+            mode = m if m in _VALID_MODES else _DEFAULT_MODE
+            key = self._directions_key(origin, destination, mode)
+            data = self._cache_get(self._dir_cache, key)
+            if data is None:
+                payload = {"origin": origin, "destination": destination, "mode": mode}
 
-            response = requests.post(
-                f"{self.api_url}/directions",
-                headers=self.headers,
-                json=payload,
-                timeout=30,
-            )
+                response = self.session.post(
+                    f"{self.api_url}/directions",
+                    data=orjson.dumps(payload),
+                    headers=_JSON_HEADERS,
+                    timeout=30,
+                )
 
-            if response.status_code == 200:
-                data = response.json()
-                duration = data.get("duration", "Unknown")
-                distance = data.get("distance", "Unknown")
-                return {
-                    "success": True,
-                    "origin": origin,
-                    "destination": destination,
-                    "mode": mode.title(),
-                    "duration": duration,
-                    "distance": distance,
-                    "start_address": data.get("start_address", origin),
-                    "end_address": data.get("end_address", destination),
-                    "directions_url": data.get("url", ""),
-                    "message": f"{mode.title()} directions: {duration} ({distance})",
-                }
-            else:
-                return {
-                    "success": False,
-                    "origin": origin,
-                    "destination": destination,
-                    "mode": mode,
-                    "message": f"No {mode} route found between these locations.",
-                }
+                data = orjson.loads(response.content) if response.status_code == 200 else None
+                self._cache_put(self._dir_cache, key, data)
+            return self._directions_result(origin, destination, mode, data)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Unexpected error: {str(e)}",
+                "message": "An unexpected error occurred while getting directions",
+            }
+
+    async def aget_directions(
+        self, origin: str, destination: str, mode: str = "driving"
+    ) -> Dict[str, Any]:
+        """Async variant of get_directions for concurrent tool calls"""
+        try:
+            m = mode.lower()
+            mode = m if m in _VALID_MODES else _DEFAULT_MODE
+            key = self._directions_key(origin, destination, mode)
+            data = self._cache_get(self._dir_cache, key)
+            if data is None:
+                payload = {"origin": origin, "destination": destination, "mode": mode}
+                data = await self._apost("/directions", payload)
+                self._cache_put(self._dir_cache, key, data)
+            return self._directions_result(origin, destination, mode, data)
         except Exception as e:
             return {
                 "success": False,
@@ -126,55 +424,68 @@ class Tools:
 tools = Tools()
 
 
-def search_places(query: str, location: str = "", place_type: str = "", radius: int = 2000) -> str:
-    """
-    Return structured data that tells OpenWebUI to render HTML
-    """
-    # Get the raw result
-    location = location.strip() if location else None
-    place_type = place_type.strip() if place_type else None
+@lru_cache(maxsize=128)
+def _normalize_place_type(place_type: str) -> str:
+    """Map a spoken place type ("gas station") to its API form ("gas_station")"""
+    return place_type.lower().replace(" ", "_")
+
+
+def _format_place(i: int, place: Dict[str, Any], embed: Optional[Dict[str, Any]]) -> str:
+    """Render one place entry, including its embed HTML and directions link"""
+    rating = place.get("rating")
+    embed_html = embed.get("embed_html", "") if embed else ""
+    directions_url = embed.get("directions_url", "") if embed else ""
+    return _PLACE_TMPL.format(
+        i=i + 1,
+        name=place.get("name", "Unknown Place"),
+        rating=f" (⭐ {rating})" if rating else "",
+        addr=place.get("address", "Address not available"),
+        embed=f"\n   {embed_html}" if embed_html else "",
+        dir=f"\n{_DIRECTIONS_PREFIX}[Get Directions]({directions_url})" if directions_url else "",
+    )
 
-    result = tools.search_places(query, location, place_type, radius)
 
+def _format_places_response(result: Dict[str, Any]) -> str:
+    """Render a Tools.search_places result as markdown with HTML embeds"""
     if not result.get("success", False):
         return result.get('message', 'Search failed')
 
+    query = result["query"]
+    location = result["location"]
     places = result.get("places", [])
     place_embeds = result.get("place_embeds", [])
 
     if not places:
         return f"No places found for '{query}'" + (f" in {location}" if location else "")
 
-    # Return a formatted response that includes the HTML embeds
-    response_parts = []
-    response_parts.append(f"Found {len(places)} places for '{query}'" + (f" in {location}" if location else ""))
-    response_parts.append("")
-
-    for i, place in enumerate(places[:5]):  # Limit to 5
-        name = place.get("name", "Unknown Place")
-        address = place.get("address", "Address not available")
-        rating = place.get("rating")
-
-        rating_text = f" (⭐ {rating})" if rating else ""
-
-        response_parts.append(f"{i+1}. **{name}**{rating_text}")
-        response_parts.append(f"   📍 {address}")
-
-        # Include the embed HTML directly in the response
-        if i < len(place_embeds):
-            embed_data = place_embeds[i]
-            embed_html = embed_data.get("embed_html", "")
-            directions_url = embed_data.get("directions_url", "")
+    total_found = result.get("total_found", len(places))
+    shown = min(len(places), _MAX_PLACES)
+    header = f"Found {total_found} places for '{query}'" + (f" in {location}" if location else "")
+    if total_found > shown:
+        header += f" (showing {shown})"
+    body = "\n".join(
+        _format_place(i, place, place_embeds[i] if i < len(place_embeds) else None)
+        for i, place in enumerate(islice(places, _MAX_PLACES))
+    )
+    return f"{header}\n\n{body}"
 
-            if embed_html:
-                response_parts.append("   " + embed_html)
 
-            if directions_url:
-                response_parts.append(f"   🧭 [Get Directions]({directions_url})")
+def _search(query: str, location: Optional[str], place_type: Optional[str], radius: int) -> Dict[str, Any]:
+    """Normalize tool arguments (blank -> None) and run Tools.search_places"""
+    return tools.search_places(
+        query,
+        (location or "").strip() or None,
+        (place_type or "").strip() or None,
+        radius,
+        limit=_MAX_PLACES,
+    )
 
-        response_parts.append("")
 
-    return "\n".join(response_parts)
+def search_places(query: str, location: str = "", place_type: str = "", radius: int = 2000) -> str:
+    """
+    Return structured data that tells OpenWebUI to render HTML
+    """
+    return _format_places_response(_search(query, location, place_type, radius))
 
 
 def get_directions(origin: str, destination: str, mode: str = "driving") -> str:
@@ -182,15 +493,7 @@ def get_directions(origin: str, destination: str, mode: str = "driving") -> str:
     result = tools.get_directions(origin, destination, mode)
 
     if result["success"]:
-        return f'''<div>
-        <h2>🧭 {result['mode']} Directions</h2>
-        <p><strong>📍 From:</strong> {result['start_address']}</p>
-        <p><strong>📍 To:</strong> {result['end_address']}</p>
-        <p><strong>⏱️ Duration:</strong> {result['duration']}</p>
-        <p><strong>📏 Distance:</strong> {result['distance']}</p>
-        <p><a href="{result['directions_url']}" target="_blank">🗺️ <strong>View Turn-by-Turn Directions</strong></a></p>
-        <p><em>💡 Tip: Click the link above for detailed navigation!</em></p>
-        </div>'''
+        return _DIRECTIONS_TEMPLATE.format(**result)
     else:
         error_html = f'<div>❌ <strong>Unable to get directions</strong><br><br>{result["message"]}'
         if result.get("suggestion"):
@@ -201,9 +504,6 @@ def get_directions(origin: str, destination: str, mode: str = "driving") -> str:
 
 def find_nearby(place_type: str, location: str = "", radius: int = 5000) -> str:
     """Find nearby places"""
-    return search_places(
-        query=place_type,
-        location=location,
-        place_type=place_type.lower().replace(" ", "_"),
-        radius=radius,
+    return _format_places_response(
+        _search(place_type, location, _normalize_place_type(place_type), radius)
     )